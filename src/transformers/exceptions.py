@@ -14,21 +14,13 @@ class ValidationError(Exception):
         if len(reasons) == 1 and isinstance(reasons[0], (list, tuple)):
             reasons = tuple(reasons[0])
 
+        # Storing the reasons as ``args`` keeps repr-ification, pickling, and compatibility with
+        # other exceptions (especially in testing) working.
+        super().__init__(*reasons)
+
         self.reasons = reasons
         """The reason(s) for this error."""
 
-    @property
-    def args(self):  # type: ignore[no-untyped-def]
-        """
-        The reason(s) for this error.
-
-        This is for repr-ification and compatibility with other exceptions, especially in testing.
-
-        Returns:
-            The reason(s) for this error.
-        """
-        return self.reasons
-
     def __str__(self) -> str:
         """
         A string representing the reason(s) for this error.
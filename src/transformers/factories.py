@@ -1,5 +1,3 @@
-import itertools
-from copy import deepcopy
 from typing import TYPE_CHECKING, List, MutableMapping, Optional, Sequence, Type, Union
 
 from transformers.impl import JsonapiDict, factories_impl
@@ -48,27 +46,23 @@ class JSONAPITransformerFactory:
             )
 
         # prevents duplicate type_name
-        transformers_by_type_name = {}
-        error_raise = False
+        transformers_by_type_name: MutableMapping[str, Type[JSONAPITransformer]] = {}
+        duplicates: MutableMapping[str, List[str]] = {}
         for transformer in transformer_classes:
-            if transformer.type_name not in transformers_by_type_name:
-                transformers_by_type_name[transformer.type_name] = [transformer.__name__]
+            existing = transformers_by_type_name.get(transformer.type_name)
+            if existing is None:
+                transformers_by_type_name[transformer.type_name] = transformer
             else:
-                transformers_by_type_name[transformer.type_name].append(transformer.__name__)
-                if not error_raise:
-                    error_raise = True
-        if error_raise:
-            transformers_by_type_name = {
-                k: v for k, v in transformers_by_type_name.items() if len(v) > 1
-            }
+                duplicates.setdefault(transformer.type_name, [existing.__name__]).append(
+                    transformer.__name__
+                )
+        if duplicates:
             raise ValueError(
                 f"More than one transformer of the same ''type_name'' was found."
-                f" Duplicates: {transformers_by_type_name}"
+                f" Duplicates: {duplicates}"
             )
 
-        self._transformers_by_type_name: MutableMapping[str, Type[JSONAPITransformer]] = {
-            transformer.type_name: transformer for transformer in transformer_classes
-        }
+        self._transformers_by_type_name = transformers_by_type_name
 
         self.allow_generic = allow_generic
         """
@@ -86,6 +80,11 @@ class JSONAPITransformerFactory:
         other methods directly. Some light validation is done on the raw data, but it is the
         responsibility of the caller to pass in correct JSONAPI data.
 
+        ``data_root`` is never modified, and it is not copied up front. Each transformer gets its
+        own ``attributes`` and ``relationships`` dictionaries, but attribute values are shared with
+        ``data_root``, so mutating a nested attribute value (e.g. a list) on a transformer will be
+        visible in ``data_root`` and vice versa.
+
         In the context of this function, and all internally called functions, the following
         definitions are applicable:
             resource/resource_dict - a JSONAPI dictionary object that contains the entirety of
@@ -99,7 +98,9 @@ class JSONAPITransformerFactory:
 
         Args:
             data_root: Dictionary of JSONAPI data, with the keys 'data' and optionally 'included'.
-                The data is expected to conform to JSONAPI standards.
+                The data is expected to conform to JSONAPI standards. The top-level 'data' and
+                to-many relationship 'data' may be a list or a tuple; any other relationship
+                'data' is a single resource, which may be any mapping.
 
         Returns:
             JSONAPITransformer instance(s) representing the passed-in data.
@@ -114,50 +115,59 @@ class JSONAPITransformerFactory:
             - Relationship items that have EITHER ``attributes`` or ``relationships`` keys.
             - Data resources that contain duplicate id/lids.
         """
-        data_root = deepcopy(data_root)
         data = data_root["data"]
+
+        if (
+            not isinstance(data, (list, tuple))
+            and not data_root.get("included")
+            and not data.get("relationships")
+        ):
+            # a single resource with nothing to link up needs none of the machinery below
+            return factories_impl.get_resource_node(self, data)
+
         includes = list(data_root.get("included", []))
         data_list = list(data if isinstance(data, (list, tuple)) else [data])
 
-        # resource is established to be the combination of data and included dicts
+        # resource is established to be the combination of data and included dicts; each resource
+        # key is computed once here and reused by every later step
         resources = data_list + includes
+        keyed_resources = factories_impl.get_keyed_resources(resources)
 
         # validation to ensure resource keys are unique
-        factories_impl.validate_resource_keys_uniqueness_for_data(resources)
-
-        # create transformers for top level data resources
-        data_map = factories_impl.ResourceIdentifierDict()
-        for data_item in data_list:
-            resource_key = factories_impl.get_resource_key(data_item)
-            data_map[resource_key] = factories_impl.get_resource_node(self, data_item)
+        factories_impl.validate_resource_keys_uniqueness_for_data(keyed_resources)
 
-        # create transformer for included resources
+        # create transformers for top level data resources and included resources, keeping track
+        # of the included ones separately for the validations below
+        resource_node_map = factories_impl.ResourceIdentifierDict()
         include_map = factories_impl.ResourceIdentifierDict()
-        for include in includes:
-            resource_key = factories_impl.get_resource_key(include)
-            include_map[resource_key] = factories_impl.get_resource_node(self, include)
-
-        # combine data and included resources into single dictionary of resources
-        resource_node_map = factories_impl.ResourceIdentifierDict(
-            itertools.chain(data_map.items(), include_map.items())
+        for index, (resource_key, resource) in enumerate(keyed_resources):
+            resource_node = factories_impl.get_resource_node(self, resource, resource_key)
+            resource_node_map[resource_key] = resource_node
+            if index >= len(data_list):
+                include_map[resource_key] = resource_node
+
+        # create all relationships for the resources (data + included); relationship keys are
+        # cached so they are not recomputed when the relationship nodes are attached below
+        key_cache: factories_impl.ResourceKeyCache = {}
+        relationships_map = factories_impl.create_relationships(
+            self, resources, resource_node_map, key_cache
         )
-        # create all relationships for the resources (data + included)
-        relationships_map = factories_impl.create_relationships(self, resources, resource_node_map)
 
         # validations to ensure that relationships and includes are associated correctly
         factories_impl.validate_relationships_for_includes(relationships_map, include_map)
         factories_impl.validate_includes_for_relationships(include_map, relationships_map)
 
-        # create a super dict of all reference-able transformers (resource + relationships)
-        reference_map = factories_impl.ResourceIdentifierDict(
-            itertools.chain(resource_node_map.items(), relationships_map.items())
-        )
-
-        # update the resource nodes with their relationship nodes
-        for resource in resources:
-            resource_node = resource_node_map[factories_impl.get_resource_key(resource)]
+        # update the resource nodes with their relationship nodes. Every relationship reference
+        # is already in `relationships_map`, pointing at the resource node when there is one, so
+        # there is no need to merge it with `resource_node_map`.
+        for resource_key, resource in keyed_resources:
+            resource_relationships = resource.get("relationships")
+            if not resource_relationships:
+                # nothing to attach to leaf resources
+                continue
+            resource_node = resource_node_map[resource_key]
             resource_node_relationships = factories_impl.get_relationship_nodes(
-                resource, reference_map
+                resource_relationships, relationships_map, key_cache
             )
             # Resource nodes can supply their own default relationships. The existing relationship
             # dictionary should only be updated and not replaced.
@@ -165,8 +175,8 @@ class JSONAPITransformerFactory:
 
         # retrieve the resource node for the top level data items
         data_items = [
-            resource_node_map[factories_impl.get_resource_key(data_inst)]
-            for data_inst in data_list
+            resource_node_map[resource_key]
+            for resource_key, _resource in keyed_resources[: len(data_list)]
         ]
 
         return data_items if isinstance(data, (list, tuple)) else data_items[0]
@@ -3,22 +3,25 @@ The entirety of this file should be considered private implementation details fo
 factories.py.
 """
 
-from collections import UserDict, defaultdict
+import sys
+from collections import Counter
 from typing import (
     TYPE_CHECKING,
-    Any,
+    Dict,
     Iterable,
     Iterator,
     List,
+    Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Tuple,
     Type,
     Union,
 )
 
 from transformers.exceptions import ContentValidationError
-from transformers.impl import JsonapiResource
+from transformers.impl import JsonapiResource, RelationshipsDict
 from transformers.transformers import JSONAPITransformer
 
 if TYPE_CHECKING:
@@ -34,44 +37,65 @@ The type of the key used by `ResourceIdentifierDict`. Tuple items represent
 """
 
 
-if TYPE_CHECKING:
-    ResourceIdentifierDictBase = UserDict[ResourceKey, JSONAPITransformer]
-else:
-    # Compatibility with Python <= 3.8
-    ResourceIdentifierDictBase = UserDict
+ResourceKeyCache = MutableMapping[int, ResourceKey]
+"""
+Resource keys already computed during a single `from_jsonapi` call, by the identity of the resource
+dictionary they were computed from. Only valid while those dictionaries are alive and unmodified.
+"""
 
 
-class ResourceIdentifierDict(ResourceIdentifierDictBase):
+class ResourceIdentifierDict(Dict[ResourceKey, JSONAPITransformer]):
     """
     Dictionary override to encompass logic for fetching and setting values to identify a JSONAPI
     resource or relationship.
 
     The dictionary will attempt to use the given key or its derivative key
     `(key[type], key[id], None)` as the identifier for the value item.
+
+    Only initialization, item access, ``in``, and ``get`` normalize keys. All other methods
+    (iteration, ``keys()``, etc) are the plain, fast ``dict`` ones and see the normalized keys.
     """
 
-    _InitialData = Union[MutableMapping[ResourceKey, JSONAPITransformer], Iterable]
+    _InitialData = Union[
+        Mapping[ResourceKey, JSONAPITransformer], Iterable[Tuple[ResourceKey, JSONAPITransformer]]
+    ]
     """The type of the initial data."""
 
-    def __init__(self, initialdata: Optional[_InitialData] = None, **kwargs: Any):
-        super().__init__(initialdata, **kwargs)
+    def __init__(self, initialdata: Optional[_InitialData] = None):
+        super().__init__()
+        if initialdata is not None:
+            items = initialdata.items() if isinstance(initialdata, Mapping) else initialdata
+            for key, value in items:
+                self[key] = value
 
-    def __setitem__(self, key: ResourceKey, value: JSONAPITransformer) -> None:
+    @staticmethod
+    def _normalize_key(key: ResourceKey) -> ResourceKey:
         """
-        Sets the item in the dictionary.
+        Return the key actually used for storage.
 
         If both the id and the lid are specified in the resource key, then just use the id as the
         main identifier for the resource.
 
         Args:
             key: The key for the resource item.
-            value: The transformer to be associated with the key.
+
+        Returns:
+            The key itself, or its derivative key `(key[type], key[id], None)`.
         """
         type_name, id_, lid = key
         if id_ is not None and lid is not None:
-            super().__setitem__((type_name, id_, None), value)
-        else:
-            super().__setitem__(key, value)
+            return type_name, id_, None
+        return key
+
+    def __setitem__(self, key: ResourceKey, value: JSONAPITransformer) -> None:
+        """
+        Sets the item in the dictionary.
+
+        Args:
+            key: The key for the resource item.
+            value: The transformer to be associated with the key.
+        """
+        super().__setitem__(self._normalize_key(key), value)
 
     def __getitem__(self, key: ResourceKey) -> JSONAPITransformer:
         """
@@ -87,12 +111,7 @@ class ResourceIdentifierDict(ResourceIdentifierDictBase):
         Raises:
             KeyError: If the given resource key, or the derivative key isn't found.
         """
-        type_name, id_, lid = key
-
-        if id_ is not None and lid is not None:
-            return super().__getitem__((type_name, id_, None))
-        else:
-            return super().__getitem__(key)
+        return super().__getitem__(self._normalize_key(key))
 
     def __contains__(self, key: object) -> bool:
         """
@@ -107,14 +126,26 @@ class ResourceIdentifierDict(ResourceIdentifierDictBase):
         if not isinstance(key, Iterable):
             return False
         try:
-            type_name, id_, lid = key
+            normalized_key = self._normalize_key(key)  # type: ignore[arg-type]
         except ValueError:
             return False
+        return super().__contains__(normalized_key)
 
-        if id_ is not None and lid is not None:
-            return super().__contains__((type_name, id_, None))
-        else:
-            return super().__contains__(key)
+    def get(  # type: ignore[override]
+        self, key: ResourceKey, default: Optional[JSONAPITransformer] = None
+    ) -> Optional[JSONAPITransformer]:
+        """
+        Retrieves the JSONAPITransformer associated with the `key` or its derivative key, with a
+        single lookup.
+
+        Args:
+            key: The key for the resource item.
+            default: Value to return if the key isn't found.
+
+        Returns:
+            The transformer, or ``default`` if the key isn't found.
+        """
+        return super().get(self._normalize_key(key), default)
 
 
 def get_class_for_type(
@@ -135,39 +166,40 @@ def get_class_for_type(
     Returns:
         JSONAPITransformer subclass
     """
-    try:
-        return factory._transformers_by_type_name[type_name]
-    except KeyError as error:
-        if factory.allow_generic:
-            return JSONAPITransformer
-        raise ValueError(f"No known transformers for type {type_name}") from error
+    transformer_class = factory._transformers_by_type_name.get(type_name)
+    if transformer_class is not None:
+        return transformer_class
+    if factory.allow_generic:
+        return JSONAPITransformer
+    raise ValueError(f"No known transformers for type {type_name}")
 
 
-def validate_resource_keys_uniqueness_for_data(resources: Iterable[JsonapiResource]) -> None:
+def validate_resource_keys_uniqueness_for_data(
+    keyed_resources: Sequence[Tuple[ResourceKey, JsonapiResource]]
+) -> None:
     """
     Validate that the data key has no duplicate resource ids.
 
     Args:
-        resources: List of resources (data + includes).
+        keyed_resources: List of resources (data + includes), each paired with its resource key as
+            returned by `get_keyed_resources`.
 
     Raises:
         ContentValidationError: If there are duplicate resource ids.
     """
-    resource_keys_count_map: MutableMapping[Tuple[Any, Any, str], int] = defaultdict(int)
+    id_counts = Counter(
+        [(type_name, id_) for (type_name, id_, _lid), _ in keyed_resources if id_ is not None]
+    )
+    lid_counts = Counter(
+        [(type_name, lid) for (type_name, _id, lid), _ in keyed_resources if lid is not None]
+    )
 
-    for resource in resources:
-        if "id" in resource:
-            key = (resource["type"], resource["id"], "id")
-            resource_keys_count_map[key] += 1
-        if "lid" in resource:
-            key = (resource["type"], resource["lid"], "lid")
-            resource_keys_count_map[key] += 1
-
-    duplicate_resources = (k for k, _count in resource_keys_count_map.items() if _count > 1)
     error_message = "Resource {resource_type} has duplicate {key_type}: {key}."
     errors = [
-        error_message.format(resource_type=resource_type, key_type=key_type, key=str(key))
-        for resource_type, key, key_type in duplicate_resources
+        error_message.format(resource_type=resource_type, key_type=key_type, key=key)
+        for key_type, counts in (("id", id_counts), ("lid", lid_counts))
+        for (resource_type, key), count in counts.items()
+        if count > 1
     ]
     if errors:
         raise ContentValidationError(errors)
@@ -187,10 +219,8 @@ def validate_relationships_for_includes(
     Raises:
         ContentValidationError: If any expected relationships are missing.
     """
-    includes_without_references = []
-    for resource_key in includes_map:
-        if resource_key not in relationships_map:
-            includes_without_references.append(resource_key)
+    # Stored keys are already normalized, so a plain set difference is enough
+    includes_without_references = includes_map.keys() - relationships_map.keys()
 
     if includes_without_references:
         missing_relationships = sorted(type_ for type_, _, _ in includes_without_references)
@@ -214,11 +244,12 @@ def validate_includes_for_relationships(
     Raises:
         ContentValidationError: If any expected includes are missing.
     """
-    missing_include_lids = []
-    for resource_key in relationships_map:
-        _type_name, _id, lid = resource_key
-        if lid is not None and resource_key not in includes_map:
-            missing_include_lids.append(lid)
+    # Stored keys are already normalized, so a plain set difference is enough
+    missing_include_lids = [
+        lid
+        for _type_name, _id, lid in relationships_map.keys() - includes_map.keys()
+        if lid is not None
+    ]
 
     if missing_include_lids:
         missing_lids_str = ", ".join(sorted(missing_include_lids))
@@ -227,17 +258,28 @@ def validate_includes_for_relationships(
         )
 
 
-def get_resource_key(resource: JsonapiResource) -> Tuple[str, Optional[str], Optional[str]]:
+def get_resource_key(
+    resource: JsonapiResource, key_cache: Optional[ResourceKeyCache] = None
+) -> ResourceKey:
     """
     Return the identifier to be associated with the resource. The `id` and `lid` of the key will be
     converted to strings if they are not ``None``.
 
     Args:
         resource: Dictionary with key `type` and optionally `id` and `lid`.
+        key_cache: If given, keys are looked up in and stored into this cache, so each resource
+            dictionary's key is computed only once.
 
     Returns:
         Tuple containing the resource's `type`, `id`, and `lid`.
     """
+    if key_cache is not None:
+        # every resource misses once, so a lookup is cheaper than catching a `KeyError`
+        resource_key = key_cache.get(id(resource))
+        if resource_key is None:
+            resource_key = key_cache[id(resource)] = get_resource_key(resource)
+        return resource_key
+
     res_id = resource.get("id")
     res_lid = resource.get("lid")
 
@@ -246,14 +288,23 @@ def get_resource_key(resource: JsonapiResource) -> Tuple[str, Optional[str], Opt
     if res_lid is not None:
         res_lid = str(res_lid)
 
-    return resource["type"], res_id, res_lid
+    res_type = resource["type"]
+    if type(res_type) is str:
+        # Interned, so the many keys and transformers of the same type share one string, and
+        # comparing them with registered type names (which are interned too) is by identity.
+        res_type = sys.intern(res_type)
+
+    return res_type, res_id, res_lid
 
 
 def iter_relationships(
     resource: JsonapiResource,
 ) -> Iterator[JsonapiResource]:
     """
-    Recursively iterate the relationships of the resource using a depth first traversal method.
+    Iterate the relationships of the resource, and the relationships of those, etc.
+
+    An explicit stack is used instead of recursion, so deeply nested data won't hit the recursion
+    limit. Ordering is not defined.
 
     Args:
         resource: Resource dictionary containing relationships.
@@ -261,23 +312,47 @@ def iter_relationships(
     Yields:
         Resource reference in the resource's relationships.
     """
-    for relation in resource.get("relationships", {}).values():
-        if relation is None or relation["data"] is None:
+    stack = [resource]
+    while stack:
+        relationships = stack.pop().get("relationships")
+        if not relationships:
             continue
 
-        # yield the resource and all sub resource for the relationship
-        if isinstance(relation["data"], (list, tuple)):
-            for item in relation["data"]:
-                yield item
-                yield from iter_relationships(item)
-        else:
-            yield relation["data"]
-            yield from iter_relationships(relation["data"])
+        for relation in relationships.values():
+            if relation is None:
+                continue
+            relation_data = relation["data"]
+            if relation_data is None:
+                continue
+
+            # yield the resource and queue it up to look at its own relationships
+            if isinstance(relation_data, (list, tuple)):
+                yield from relation_data
+                stack.extend(relation_data)
+            else:
+                yield relation_data
+                stack.append(relation_data)
+
+
+def get_keyed_resources(
+    resources: Iterable[JsonapiResource],
+) -> List[Tuple[ResourceKey, JsonapiResource]]:
+    """
+    Pair each resource with its resource key, so that the key is only computed once.
+
+    Args:
+        resources: Iterable containing resource data.
+
+    Returns:
+        List of ``(resource_key, resource)`` tuples, in the same order as ``resources``.
+    """
+    return [(get_resource_key(resource), resource) for resource in resources]
 
 
 def get_resource_node(
     factory: "JSONAPITransformerFactory",
     resource: JsonapiResource,
+    resource_key: Optional[ResourceKey] = None,
 ) -> JSONAPITransformer:
     """
     For all resources in the raw data, return transformer instance using the type, id, lid
@@ -286,18 +361,25 @@ def get_resource_node(
     Args:
         factory: Factory for instantiating transformers by their JSONAPI `type`.
         resource: Dictionary containing resource data.
+        resource_key: The resource's key, if already computed by the caller.
 
     Returns:
-        JSONAPITransformer instantiated with the resource's data.
+        JSONAPITransformer instantiated with the resource's data. Its relationships are left empty;
+            they are attached afterwards, once all the related transformers exist.
     """
-    r_type, r_id, r_lid = get_resource_key(resource)
-    resource_class = get_class_for_type(factory, r_type)
+    if resource_key is None:
+        resource_key = get_resource_key(resource)
+    r_type, r_id, r_lid = resource_key
+    # `get_class_for_type` is only called for types without a registered class, which saves a
+    # function call per resource in the common case
+    resource_class = factory._transformers_by_type_name.get(r_type) or get_class_for_type(
+        factory, r_type
+    )
     return resource_class(
         type_name=r_type,
         id=r_id,
         lid=r_lid,
-        attributes=resource.get("attributes", {}),
-        relationships=resource.get("relationships", {}),
+        attributes=resource.get("attributes"),
     )
 
 
@@ -305,6 +387,7 @@ def create_relationships(
     factory: "JSONAPITransformerFactory",
     resources: Iterable[JsonapiResource],
     resource_node_map: ResourceIdentifierDict,
+    key_cache: Optional[ResourceKeyCache] = None,
 ) -> ResourceIdentifierDict:
     """
     Create a new relationship transformer instance or assign an existing relationship transformer
@@ -315,6 +398,7 @@ def create_relationships(
         resources: Iterable containing resource data.
         resource_node_map: Mapping of the resource key to the JSONAPITransformer that it is
             associated with.
+        key_cache: Cache for the computed relationship resource keys. See `get_resource_key`.
 
     Returns:
         Mapping of all the relationship transformers that have been associated with the resources.
@@ -327,7 +411,7 @@ def create_relationships(
     relationships_map = ResourceIdentifierDict()
     for resource in resources:
         for ref_relation in iter_relationships(resource):
-            resource_key = (res_type, res_id, res_lid) = get_resource_key(ref_relation)
+            resource_key = (res_type, res_id, res_lid) = get_resource_key(ref_relation, key_cache)
             if res_id is None and res_lid is None:
                 raise ContentValidationError(
                     f"Relationship for type '{res_type}' must contain either 'id' or 'lid'"
@@ -340,26 +424,31 @@ def create_relationships(
                 raise ContentValidationError(
                     f"Relationship '{res_type}' cannot contain the key 'relationships'"
                 )
+            if resource_key in relationships_map:
+                # Shared targets are referenced many times, but only need to be resolved once
+                continue
             # fetch or create transformer to be associated with the reference resource
-            if resource_key in resource_node_map:
-                relationships_map[resource_key] = resource_node_map[resource_key]
-            else:
-                relationships_map[resource_key] = get_resource_node(factory, ref_relation)
+            relationship_node = resource_node_map.get(resource_key)
+            if relationship_node is None:
+                relationship_node = get_resource_node(factory, ref_relation, resource_key)
+            relationships_map[resource_key] = relationship_node
 
     return relationships_map
 
 
 def get_relationship_nodes(
-    resource: JsonapiResource,
+    relationships: RelationshipsDict,
     resource_node_map: ResourceIdentifierDict,
+    key_cache: Optional[ResourceKeyCache] = None,
 ) -> MutableMapping[str, Optional[Union[JSONAPITransformer, List[JSONAPITransformer]]]]:
     """
-    For the given resource, retrieve its relationship nodes from the `resource_node_map`.
+    For the given resource relationships, retrieve their nodes from the `resource_node_map`.
 
     Args:
-        resource: Dictionary containing resource data.
+        relationships: The resource's "relationships" dictionary.
         resource_node_map: Mapping of the resource key to the JSONAPITransformer that it is
             associated with.
+        key_cache: Cache for the computed relationship resource keys. See `get_resource_key`.
 
     Returns:
         Mapping of the relationship key to the resource node found in `resource_node_map`.
@@ -369,23 +458,24 @@ def get_relationship_nodes(
             Union[JSONAPITransformer, List[JSONAPITransformer]]
         ] = None
 
+    get_node = resource_node_map.__getitem__
     resource_relationships = {}
-    for relation_key, relation_value in resource.get("relationships", {}).items():
-        if relation_value is None or relation_value["data"] is None:
+    for relation_key, relation_value in relationships.items():
+        relation_data = None if relation_value is None else relation_value["data"]
+
+        if relation_data is None:
             # if the relation is empty
             resource_relation_value = None
 
-        elif isinstance(relation_value["data"], (list, tuple)):
+        elif isinstance(relation_data, (list, tuple)):
             # fetch each of the related nodes from the resource node map
-            related_nodes = [
-                resource_node_map[get_resource_key(item)] for item in relation_value["data"]
+            resource_relation_value = [
+                get_node(get_resource_key(item, key_cache)) for item in relation_data
             ]
-            resource_relation_value = related_nodes
 
         else:
             # directly retrieve the related node from the resource node map
-            related_node = resource_node_map[get_resource_key(relation_value["data"])]
-            resource_relation_value = related_node
+            resource_relation_value = get_node(get_resource_key(relation_data, key_cache))
 
         resource_relationships[relation_key] = resource_relation_value
 
@@ -5,7 +5,18 @@ transformers.py.
 
 from collections import deque
 from copy import deepcopy
-from typing import TYPE_CHECKING, Iterator, List, MutableSet, Optional, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Iterator,
+    List,
+    MutableMapping,
+    MutableSet,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 from transformers.exceptions import ContentValidationError
 from transformers.impl import JsonapiResource, RelationshipsDict
@@ -14,6 +25,24 @@ if TYPE_CHECKING:
     from transformers.transformers import JSONAPITransformer
 
 
+SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+"""Immutable attribute value types. A dictionary of only these is fully copied by `dict()`."""
+
+
+TO_MANY_TYPES = (list, tuple)
+"""
+Types of to-many relationship values. They are checked by exact type first, which is cheapest for
+the usual plain lists, and then with ``isinstance``, so that subclasses such as named tuples work.
+"""
+
+
+ReferenceCache = MutableMapping[int, RelationshipsDict]
+"""
+Relationship 'data' dictionaries already built during a single serialization, by the identity of
+the transformer they were built from. Only valid while those transformers are alive and unmodified.
+"""
+
+
 def object_identifier(obj: object) -> int:
     """
     Return the “identity” of an object. This is an integer which is guaranteed to be unique and
@@ -42,6 +71,24 @@ def object_key(transformer: "JSONAPITransformer") -> Tuple[str, Optional[str], O
     return transformer.type_name, transformer.id, transformer.lid
 
 
+def object_jsonapi_key(
+    transformer: "JSONAPITransformer",
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Return the "key" a transformer object will have once converted into JSONAPI, ie, with its
+    `id` and `lid` converted to strings.
+
+    Args:
+        transformer: A transformer object.
+
+    Returns:
+        The transformer's `type`, `id`, and `lid` as they appear in JSONAPI.
+    """
+    id_ = None if transformer.id is None else str(transformer.id)
+    lid = None if transformer.lid is None else str(transformer.lid)
+    return transformer.type_name, id_, lid
+
+
 def apply_defaults_non_recursively(transformer: "JSONAPITransformer") -> None:
     """
     Utility method to apply defaults to this transformer only.
@@ -71,26 +118,37 @@ def iter_transformer_and_relationships_recursively(
         A transformer. The transformer itself is yielded before looking at its relationships, in
             case the calling function wants to modify those relationships.
     """
-    queue = deque([transformer])
-    seen = set()
+    # Ordering is not defined, so a plain list works as a (depth first) stack
+    stack = [transformer]
+    seen: MutableMapping[int, None] = {}
+    # bound once, as these are called for every node
+    pop_next, queue_one, queue_many = stack.pop, stack.append, stack.extend
 
-    while queue:
-        candidate = queue.popleft()
+    while stack:
+        candidate = pop_next()
+
+        if candidate is None:
+            continue
 
-        if candidate is None or object_identifier(candidate) in seen:
+        # Insert first and check whether the size changed, so each node is only hashed once.
+        # `id` rather than `object_identifier`, to save a function call per visited node.
+        seen_count = len(seen)
+        seen[id(candidate)] = None
+        if len(seen) == seen_count:
             continue
 
-        seen.add(object_identifier(candidate))
         yield candidate
 
         for relationship in candidate.relationships.values():
-            if isinstance(relationship, (list, tuple)):
-                queue.extend(relationship)
+            if type(relationship) in TO_MANY_TYPES or isinstance(relationship, TO_MANY_TYPES):
+                queue_many(relationship)
             else:
-                queue.append(relationship)
+                queue_one(relationship)
 
 
-def to_jsonapi_data(transformer: "JSONAPITransformer") -> JsonapiResource:
+def to_jsonapi_data(
+    transformer: "JSONAPITransformer", reference_cache: Optional[ReferenceCache] = None
+) -> JsonapiResource:
     """
     Create a JSONAPI 'data' dictionary with the properties of this instance.
 
@@ -98,6 +156,8 @@ def to_jsonapi_data(transformer: "JSONAPITransformer") -> JsonapiResource:
 
     Args:
         transformer: A transformer object.
+        reference_cache: Cache for the relationship 'data' dictionaries. See
+            `get_relationship_data`.
 
     Returns:
         A 'data' dictionary with 'type'; and optionally 'id', 'lid', 'attributes', and/or
@@ -105,7 +165,7 @@ def to_jsonapi_data(transformer: "JSONAPITransformer") -> JsonapiResource:
     """
 
     relationships = {
-        name: {"data": get_relationship_data(rel_obj)}
+        name: {"data": get_relationship_data(rel_obj, reference_cache)}
         for name, rel_obj in transformer.relationships.items()
     }
 
@@ -123,15 +183,28 @@ def to_jsonapi_data(transformer: "JSONAPITransformer") -> JsonapiResource:
     if transformer.lid is not None:  # user-provided, so don't assume they didn't put 0
         data["lid"] = str(transformer.lid)
 
-    common_keys = set(transformer.attributes) & set(transformer.relationships)
+    # Look up the keys of the smaller dictionary in the larger one, so no sets need to be built
+    # in the usual case where there is no overlap.
+    attributes = transformer.attributes
+    if len(attributes) <= len(transformer.relationships):
+        smaller, larger = attributes, transformer.relationships
+    else:
+        smaller, larger = transformer.relationships, attributes
+    common_keys = [key for key in smaller if key in larger]
     if common_keys:
         raise ContentValidationError(
             "Key names cannot be common to both `attributes` and `relationships`: "
             f"{sorted(common_keys)}"
         )
 
-    if transformer.attributes:
-        data["attributes"] = deepcopy(transformer.attributes)
+    if attributes:
+        if transformer.deep_copy_attributes and not all(
+            type(value) in SCALAR_TYPES for value in attributes.values()
+        ):
+            data["attributes"] = deepcopy(attributes)
+        else:
+            # a shallow copy is already a full copy when there is nothing nested
+            data["attributes"] = dict(attributes)
     if relationships:
         data["relationships"] = relationships
     return data
@@ -143,7 +216,8 @@ def get_relationship_data(
         "JSONAPITransformer",
         List["JSONAPITransformer"],
         Tuple["JSONAPITransformer"],
-    ]
+    ],
+    reference_cache: Optional[ReferenceCache] = None,
 ) -> Union[None, RelationshipsDict, List[RelationshipsDict]]:
     """
     Convert the passed-in JSONAPITransformer instance or list of instances into JSONAPI
@@ -151,6 +225,9 @@ def get_relationship_data(
 
     Args:
         obj: JSONAPITransformer instance, list or tuple of them, or None.
+        reference_cache: If given, the dictionary built for each transformer is looked up in and
+            stored into this cache, so a transformer referenced many times only gets one
+            dictionary, shared by all the references to it.
 
     Returns:
         JSONAPI relationship 'data' dictionary or list of dictionaries, where the dictionary
@@ -163,14 +240,26 @@ def get_relationship_data(
     if obj is None:
         return None
 
-    if isinstance(obj, (list, tuple)):
-        return [get_relationship_data(this_obj) for this_obj in obj]  # type: ignore[misc]
+    if type(obj) in TO_MANY_TYPES or isinstance(obj, TO_MANY_TYPES):
+        return [
+            get_relationship_data(this_obj, reference_cache)  # type: ignore[misc]
+            for this_obj in obj  # type: ignore[union-attr]
+        ]
 
-    data = {"type": obj.type_name}
-    if obj.id is not None:
-        data["id"] = str(obj.id)
-    elif obj.lid is not None:
-        data["lid"] = str(obj.lid)
+    transformer = cast("JSONAPITransformer", obj)
+    if reference_cache is not None:
+        cached_data = reference_cache.get(id(transformer))
+        if cached_data is not None:
+            return cached_data
+
+    data = {"type": transformer.type_name}
+    if transformer.id is not None:
+        data["id"] = str(transformer.id)
+    elif transformer.lid is not None:
+        data["lid"] = str(transformer.lid)
+
+    if reference_cache is not None:
+        reference_cache[id(transformer)] = data
     return data
 
 
@@ -191,14 +280,16 @@ def to_includes(transformer: "JSONAPITransformer") -> Iterator["JSONAPITransform
     """
     includes = {}
     to_process = deque([transformer])
+    # bound once, as these are called for every node
+    pop_next, queue_one, queue_many = to_process.popleft, to_process.append, to_process.extend
 
     while to_process:
-        obj = to_process.popleft()
+        obj = pop_next()
 
         if obj is None:
             continue
 
-        obj_key = object_key(obj)
+        obj_key = (obj.type_name, obj.id, obj.lid)  # inlined `object_key`
 
         if obj_key in includes:
             # We've already seen this one
@@ -213,10 +304,10 @@ def to_includes(transformer: "JSONAPITransformer") -> Iterator["JSONAPITransform
             includes[obj_key] = obj
 
         for rel_obj in obj.relationships.values():
-            if isinstance(rel_obj, (list, tuple)):
-                to_process.extend(rel_obj)
+            if type(rel_obj) in TO_MANY_TYPES or isinstance(rel_obj, TO_MANY_TYPES):
+                queue_many(rel_obj)
             else:
-                to_process.append(rel_obj)
+                queue_one(rel_obj)
 
     yield from includes.values()
 
@@ -230,6 +321,10 @@ def eq_helper(
     """
     Helper function to support comparisons of recursive relationships.
 
+    Related objects are compared using an explicit stack rather than recursion, so deep
+    relationship trees won't hit the recursion limit. Objects that are identical are equal without
+    looking any further.
+
     Args:
         lhs: JSONAPITransformer on the left-hand side of the equals sign.
         rhs: Object on the right-hand side of the equals sign.
@@ -238,63 +333,69 @@ def eq_helper(
 
     Returns:
         Indication whether all values of the JSONAPITransformer are equal to the compared
-            object. If ``other`` is not a JSONAPITransformer, `NotImplemented` is returned.
+            object. If ``other`` (or any related object compared along the way) is not a
+            JSONAPITransformer, `NotImplemented` is returned.
     """
-    if not isinstance(rhs, cls):
-        return NotImplemented
-
-    # check if the instances have already been compared
-    if (object_identifier(lhs), object_identifier(rhs)) in seen:
-        return True
-
-    # add the pair that will be compared
-    seen.add((object_identifier(lhs), object_identifier(rhs)))
-
-    # the base attributes
-    base_case = (
-        lhs.type_name == rhs.type_name
-        and lhs.id == rhs.id
-        and lhs.lid == rhs.lid
-        and lhs.attributes == rhs.attributes
-    )
-    if not base_case:
-        return False
-
-    # if relationship keys are different then they are not equal
-    if set(lhs.relationships) != set(rhs.relationships):
-        return False
-
-    # compare individual keys on the relationship, complicated by the different
-    # types that are allowed
-    for rel_key, rel_value in lhs.relationships.items():
-        other_value = rhs.relationships[rel_key]
-
-        # if it's an instance of the transformer, then it can be compared directly
-        if isinstance(rel_value, cls):
-            equal = eq_helper(rel_value, other_value, seen, cls)
-            if equal is not True:
-                return equal
-            # look at the next item in the relationships
+    to_compare: List[Tuple["JSONAPITransformer", object]] = [(lhs, rhs)]
+
+    while to_compare:
+        left, right = to_compare.pop()
+
+        if left is right:
             continue
 
-        # otherwise comparison will need to be made item by item
-        if isinstance(rel_value, (list, tuple)) and isinstance(other_value, (list, tuple)):
-            if len(rel_value) != len(other_value):
-                return False
-
-            rel_pairs = zip(rel_value, other_value)
-            for rel_value_inst, other_value_inst in rel_pairs:
-                equal = eq_helper(rel_value_inst, other_value_inst, seen, cls)
-                if equal is not True:
-                    return equal
-            # both sequences are empty or equal, look at the next item in the relationships
+        if not isinstance(right, cls):
+            return NotImplemented
+
+        # check if the instances have already been compared
+        pair = (object_identifier(left), object_identifier(right))
+        if pair in seen:
             continue
 
-        # None is an allowed value for a relationship
-        if rel_value is None:
-            return other_value is None
+        # add the pair that will be compared
+        seen.add(pair)
+
+        # the base attributes
+        base_case = (
+            left.type_name == right.type_name
+            and left.id == right.id
+            and left.lid == right.lid
+            and left.attributes == right.attributes
+        )
+        if not base_case:
+            return False
+
+        # if relationship keys are different then they are not equal (keys views compare like
+        # sets, without building any)
+        if left.relationships.keys() != right.relationships.keys():
+            return False
+
+        # compare individual keys on the relationship, complicated by the different
+        # types that are allowed
+        related_pairs: List[Tuple["JSONAPITransformer", object]] = []
+        for rel_key, rel_value in left.relationships.items():
+            other_value = right.relationships[rel_key]
+
+            # if it's an instance of the transformer, then it can be compared directly
+            if isinstance(rel_value, cls):
+                related_pairs.append((rel_value, other_value))
+
+            # otherwise comparison will need to be made item by item
+            elif isinstance(rel_value, TO_MANY_TYPES) and isinstance(other_value, TO_MANY_TYPES):
+                if len(rel_value) != len(other_value):
+                    return False
+                related_pairs.extend(zip(rel_value, other_value))
+
+            # None is an allowed value for a relationship
+            elif rel_value is None:
+                if other_value is not None:
+                    return False
+
+            # other values will not be supported for relationship comparisons
+            else:
+                return NotImplemented
 
-        # other values will not be supported for relationship comparisons
-        return NotImplemented
+        # compare related objects in relationship order, depth first
+        to_compare.extend(reversed(related_pairs))
 
     return True
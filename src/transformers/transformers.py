@@ -5,11 +5,15 @@ https://jsonapi.org/format/1.1/.
 """
 
 import reprlib
-from typing import Any, List, MutableMapping, Optional, Sequence
+import sys
+from typing import Any, List, MutableMapping, Optional, Sequence, Tuple
 
 from transformers.exceptions import ContentValidationError
 from transformers.impl import AttributesDict, JsonapiDict, RelationshipsDict, transformers_impl
 
+# Marks a missing key, as `None` is a valid attribute value.
+_MISSING = object()
+
 
 class JSONAPITransformer:
     """
@@ -29,6 +33,22 @@ class JSONAPITransformer:
     instantiation.
     """
 
+    deep_copy_attributes: bool = False
+    """
+    Should ``to_jsonapi`` deep copy ``attributes``?
+
+    By default only the attributes dictionary itself is copied, so nested attribute values (e.g.
+    lists or dicts) are shared between this instance and its JSONAPI output. Set this to ``True``
+    on a derived class if the output's nested values will be mutated independently.
+    """
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Intern the ``type_name`` defined by a subclass, as type names given on init are."""
+        super().__init_subclass__(**kwargs)
+        type_name = cls.__dict__.get("type_name")
+        if type(type_name) is str:
+            cls.type_name = sys.intern(type_name)
+
     def __init__(
         self,
         type_name: Optional[str] = None,
@@ -54,14 +74,12 @@ class JSONAPITransformer:
         Raises:
             ValueError: if ``type_name`` not defined on this class or provided on init.
         """
-        if attributes is None:
-            attributes = {}
-        if relationships is None:
-            relationships = {}
-
         if type_name is not None:
             if self.type_name is None:
-                self.type_name = type_name
+                # Interned, as there are usually many instances of just a few types, and their type
+                # names are hashed and compared a lot. Subclasses' type names are interned by
+                # `__init_subclass__`.
+                self.type_name = sys.intern(type_name) if type(type_name) is str else type_name
             elif type_name != self.type_name:
                 raise ValueError(f"Cannot override type name {self.type_name} defined on class.")
 
@@ -77,14 +95,17 @@ class JSONAPITransformer:
         self.lid: Optional[str] = lid
         """Temporary "local" id."""
 
-        self.attributes: AttributesDict = dict(attributes)
+        # a single allocation each, whether or not the dictionaries were given
+        self.attributes: AttributesDict = {} if attributes is None else dict(attributes)
         """
         Dictionary of direct attributes. Values are not restricted. As a shortcut, items can be
         directly retrieved, added to, and removed from this dictionary by operating directly on the
         class instance.
         """
 
-        self.relationships: RelationshipsDict = dict(relationships)
+        self.relationships: RelationshipsDict = (
+            {} if relationships is None else dict(relationships)
+        )
         """
         Dictionary of related objects. The values of this dictionary must be JSONAPITransformer
         subclasses or lists or tuples of them. As a shortcut, items can be retrieved from this
@@ -137,14 +158,23 @@ class JSONAPITransformer:
         This is the opposite of ``JSONAPITransformerFactory.from_jsonapi``. Adds related items into
         an 'included' section, when necessary.
 
+        Nested attribute values are shared with the output unless ``deep_copy_attributes`` is set.
+        Within the output, all relationship identifiers for the same related transformer are the
+        same dictionary, so callers must copy an identifier before mutating it (e.g. to add
+        ``meta``), or the change will show up in every reference to that transformer.
+
         Returns:
             A dict with 'data' and possibly 'included' attributes representing this instance.
         """
 
-        data_root: JsonapiDict = {"data": transformers_impl.to_jsonapi_data(self)}
+        # relationship identifiers are built once per related transformer, and shared
+        reference_cache: transformers_impl.ReferenceCache = {}
+        data_root: JsonapiDict = {"data": transformers_impl.to_jsonapi_data(self, reference_cache)}
 
         includes = transformers_impl.to_includes(self)
-        included = [transformers_impl.to_jsonapi_data(include) for include in includes]
+        included = [
+            transformers_impl.to_jsonapi_data(include, reference_cache) for include in includes
+        ]
         if included:
             data_root["included"] = included
 
@@ -179,19 +209,21 @@ class JSONAPITransformer:
         Returns:
             Value of key in instance's attributes (checked first) or relationships.
         """
-        if key in self.attributes and key in self.relationships:
-            # This is not ideal. Ideally we'd prevent this from happening on
-            #    * self.`__setitem__`
-            #    * `attributes.__setitem__`
-            #    * `relationships.__setitem__`
-            raise ContentValidationError(
-                f"Key `{key}` must not be in both attributes and relationships."
-            )
+        value = self.attributes.get(key, _MISSING)
+        if value is not _MISSING:
+            if key in self.relationships:
+                # This is not ideal. Ideally we'd prevent this from happening on
+                #    * self.`__setitem__`
+                #    * `attributes.__setitem__`
+                #    * `relationships.__setitem__`
+                raise ContentValidationError(
+                    f"Key `{key}` must not be in both attributes and relationships."
+                )
+            return value
 
-        if key in self.attributes:
-            return self.attributes[key]
-        if key in self.relationships:
-            return self.relationships[key]
+        value = self.relationships.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
         __tracebackhide__ = True  # Seeing this function in the main traceback is counterproductive
         raise KeyError(key)
 
@@ -240,14 +272,12 @@ class JSONAPITransformer:
         """
         Check to see if a value is ``in`` this instance's ``attributes`` or ``relationships``.
 
+        Unlike ``self[key]``, this does not raise if the key is in both.
+
         Returns:
             Indication whether key was found.
         """
-        try:
-            _ = self[key]
-            return True
-        except KeyError:
-            return False
+        return key in self.attributes or key in self.relationships
 
     def __eq__(self, other: object) -> bool:
         """
@@ -270,8 +300,8 @@ class JSONAPITransformer:
         Returns:
             Python representation of this object.
         """
-        attributes = dict(sorted((key, value) for key, value in self.attributes.items()))
-        relationships = dict(sorted((key, value) for key, value in self.relationships.items()))
+        attributes = dict(sorted(self.attributes.items()))
+        relationships = dict(sorted(self.relationships.items()))
         return (
             f"{self.__class__.__name__}(type_name={self.type_name!r}, "
             f"id={self.id!r}, lid={self.lid!r}, attributes={attributes!r}, "
@@ -286,8 +316,8 @@ class JSONAPITransformer:
         Returns:
             Pretty representation for the Rich library.
         """
-        attributes = dict(sorted((key, value) for key, value in self.attributes.items()))
-        relationships = dict(sorted((key, value) for key, value in self.relationships.items()))
+        attributes = dict(sorted(self.attributes.items()))
+        relationships = dict(sorted(self.relationships.items()))
         yield "type_name", self.type_name
         yield "id", self.id
         yield "lid", self.lid
@@ -313,29 +343,34 @@ class JSONAPIListTransformer:
         """
         Convert transformers into JSONAPI, resulting in a list of data elements and includes.
 
+        As with ``JSONAPITransformer.to_jsonapi``, all relationship identifiers for the same
+        related transformer are the same dictionary, across all the transformers; copy one before
+        mutating it.
+
         Returns:
             JSONAPI dictionary with JSONAPI `data` list and includes (if needed).
         """
-        jsonapi_data: MutableMapping[str, List[JsonapiDict]] = {"data": []}
-        jsonapi_included = []
-        included_keys = set()
-
-        # Convert each transformer to a JSONAPI dictionary
+        # relationship identifiers are built once per related transformer, and shared
+        reference_cache: transformers_impl.ReferenceCache = {}
+
+        # Convert each transformer to a JSONAPI dictionary, and collect the includes that the
+        # transformers may have generated, in a single pass, as the transformers may be given as a
+        # one-shot iterable. Only keep the first of each include, as related objects are often
+        # shared between transformers; the dict keeps them in order of first appearance.
+        data: List[JsonapiDict] = []
+        includes_by_key: MutableMapping[
+            Tuple[str, Optional[str], Optional[str]], JSONAPITransformer
+        ] = {}
         for transformer in self.transformers:
-            result = transformer.to_jsonapi()
-            jsonapi_data["data"].append(result["data"])
-
-            # Process the includes that this transformer may have generated. Only add to included
-            # set if it does not already exist.
-            if "included" in result:
-                for include in result["included"]:
-                    key = (include.get("type"), include.get("id"), include.get("lid"))
-                    if key in included_keys:
-                        continue
-                    included_keys.add(key)
-                    jsonapi_included.append(include)
-
-        if jsonapi_included:
-            jsonapi_data["included"] = jsonapi_included
+            data.append(transformers_impl.to_jsonapi_data(transformer, reference_cache))
+            for include in transformers_impl.to_includes(transformer):
+                includes_by_key.setdefault(transformers_impl.object_jsonapi_key(include), include)
+
+        jsonapi_data: MutableMapping[str, List[JsonapiDict]] = {"data": data}
+        if includes_by_key:
+            jsonapi_data["included"] = [
+                transformers_impl.to_jsonapi_data(include, reference_cache)
+                for include in includes_by_key.values()
+            ]
 
         return jsonapi_data
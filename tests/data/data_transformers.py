@@ -3,13 +3,20 @@ Data structures to use in testing the JSONAPI Transformers.
 """
 # flake8: noqa: E701 - Allow long lines as some transformations are much easier to read that way
 # pylint: disable=line-too-long
-from copy import deepcopy
+import pickle
+from typing import Any
 
 from tests.data import sample_transformers as st
 
-# To support JSONAPITransformers that have internal references, these placeholder values will be
-# set to be replaced with the created object after instantiation.
-reference_placeholder = object()
+
+def copy_json(value: Any) -> Any:
+    """
+    Deep copy JSON-shaped data (dicts, lists and scalars).
+
+    A pickle round trip is done entirely in C, so it is much faster than `copy.deepcopy`.
+    """
+    return pickle.loads(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
 
 # Basic JSONAPI message that contains relationships and includes which are associated by lid
 # Most test structures do not have multiple key/value pairs for attributes, but this one does.
@@ -378,9 +385,30 @@ JSONAPI_TOP_LIST = {
 }
 # JSONAPI_TOP_LIST_CORRECTED is the same as JSONAPI_TOP_LIST, the only difference being that the
 # relationships are set to a dictionary and not None.
-JSONAPI_TOP_LIST_CORRECTED = deepcopy(JSONAPI_TOP_LIST)
-JSONAPI_TOP_LIST_CORRECTED["data"][0]["relationships"]["superceded_by"] = {"data": None}
-JSONAPI_TOP_LIST_CORRECTED["data"][1]["relationships"]["superceded_by"] = {"data": None}
+JSONAPI_TOP_LIST_CORRECTED = {
+    "data": [
+        {
+            "type": "document",
+            "id": "d1",
+            "attributes": {"role": "diligence"},
+            "relationships": {
+                "parent": {"data": {"type": "quote", "id": "q1"}},
+                "intake_agent": {"data": {"type": "agent", "id": "a1"}},
+                "superceded_by": {"data": None},
+            },
+        },
+        {
+            "type": "document",
+            "id": "d2",
+            "attributes": {"role": "application"},
+            "relationships": {
+                "parent": {"data": {"type": "quote", "id": "q1"}},
+                "intake_agent": {"data": {"type": "agent", "id": "a1"}},
+                "superceded_by": {"data": None},
+            },
+        },
+    ]
+}
 JSONAPI_TOP_LIST_TRANSFORMERS = [
     st.DocumentTransformer(
         id="d1",
@@ -411,8 +439,8 @@ JSONAPI_SAME_ID_VALUE_IN_TOP_LEVEL_RESOURCE = {
 }
 
 JSONAPI_SAME_ID_VALUE_IN_TOP_LEVEL_RESOURCE_TRANSFORMERS = [
-    st.DocumentTransformer(id="id1", attributes={"x": "y"}, relationships={}),
-    st.DocumentTransformer(id="id1", attributes={"x": "z"}, relationships={}),
+    st.DocumentTransformer(id="id1", attributes={"x": "y"}),
+    st.DocumentTransformer(id="id1", attributes={"x": "z"}),
 ]
 
 
@@ -546,122 +574,97 @@ JSONAPI_RECURSIVE = {
         },
     ],
 }
-JSONAPI_RECURSIVE_TRANSFORMER = st.ProductTransformer(
-    id="p1",
-    attributes={"is_admitted": True},
-    relationships={
-        "terms": [
-            st.TermTransformer(
-                id="t1",
-                attributes={"term_length_unit": "months"},
-                relationships={"product": reference_placeholder},
-            )
-        ],
-        "states": [],
-        "coverages": [
-            st.ProductCoverageTransformer(
-                id="pc1",
-                attributes={"base_premium": "100.00"},
-                relationships={
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l2",
-                            attributes={"amount": "2000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "product": reference_placeholder,
-                    "deductibles": [
-                        st.DeductibleTransformer(
-                            id="d1",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc2",
-                attributes={"base_premium": "200.00"},
-                relationships={
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l1",
-                            attributes={"amount": "5000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "product": st.ProductTransformer(id="p1"),
-                    "deductibles": [
-                        st.DeductibleTransformer(
-                            id="d2",
-                            attributes={
-                                "created_date": "2018-05-31T01:07:04.123219",
-                                "modified_date": "2018-05-31T01:07:04.123233",
-                                "amount": "100.00",
-                            },
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "depends_on": None,
-                },
-            ),
-        ],
-        "deductibles": [
-            st.ProductDeductibleTransformer(
-                id="pd1",
-                attributes={"amount": "500.00"},
-                relationships={"product": reference_placeholder},
-            )
-        ],
-        "company": st.CompanyTransformer(id="c1"),
-        "product_type": st.ProductTypeTransformer(id="pt1"),
-        "installment_plans": [
-            st.InstallmentPlanTransformer(id="ip1", attributes={"name": "MONTH"}),
-            st.InstallmentPlanTransformer(id="ip2", attributes={"name": "QUARTER"}),
-            st.InstallmentPlanTransformer(id="ip3", attributes={"name": "SEMI-ANNUAL"}),
-        ],
-    },
-)
-# fmt: off
-JSONAPI_RECURSIVE_TRANSFORMER["terms"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER
-JSONAPI_RECURSIVE_TRANSFORMER["deductibles"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][1].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][0]["limits"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER["coverages"][0]
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][0]["deductibles"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER["coverages"][0]
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][1]["limits"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER["coverages"][1]
-JSONAPI_RECURSIVE_TRANSFORMER["coverages"][1]["deductibles"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER["coverages"][1]
-# fmt: on
+
+
+def _build_recursive_transformer():
+    """
+    Build the expected transformer for JSONAPI_RECURSIVE. Each transformer is created before the
+    ones that refer back to it, so the circular relationships can be set as they are built.
+    """
+    product = st.ProductTransformer(id="p1", attributes={"is_admitted": True})
+
+    coverage_1 = st.ProductCoverageTransformer(id="pc1", attributes={"base_premium": "100.00"})
+    coverage_1.relationships.update(
+        {
+            "limits": [
+                st.LimitTransformer(
+                    id="l2",
+                    attributes={"amount": "2000.00"},
+                    relationships={"coverage": coverage_1},
+                )
+            ],
+            "product": product,
+            "deductibles": [
+                st.DeductibleTransformer(
+                    id="d1",
+                    attributes={"amount": "500.00"},
+                    relationships={"coverage": coverage_1},
+                )
+            ],
+            "depends_on": None,
+        }
+    )
+
+    coverage_2 = st.ProductCoverageTransformer(id="pc2", attributes={"base_premium": "200.00"})
+    coverage_2.relationships.update(
+        {
+            "limits": [
+                st.LimitTransformer(
+                    id="l1",
+                    attributes={"amount": "5000.00"},
+                    relationships={"coverage": coverage_2},
+                )
+            ],
+            "product": product,
+            "deductibles": [
+                st.DeductibleTransformer(
+                    id="d2",
+                    attributes={
+                        "created_date": "2018-05-31T01:07:04.123219",
+                        "modified_date": "2018-05-31T01:07:04.123233",
+                        "amount": "100.00",
+                    },
+                    relationships={"coverage": coverage_2},
+                )
+            ],
+            "depends_on": None,
+        }
+    )
+
+    product.relationships.update(
+        {
+            "terms": [
+                st.TermTransformer(
+                    id="t1",
+                    attributes={"term_length_unit": "months"},
+                    relationships={"product": product},
+                )
+            ],
+            "states": [],
+            "coverages": [coverage_1, coverage_2],
+            "deductibles": [
+                st.ProductDeductibleTransformer(
+                    id="pd1",
+                    attributes={"amount": "500.00"},
+                    relationships={"product": product},
+                )
+            ],
+            "company": st.CompanyTransformer(id="c1"),
+            "product_type": st.ProductTypeTransformer(id="pt1"),
+            "installment_plans": [
+                st.InstallmentPlanTransformer(id="ip1", attributes={"name": "MONTH"}),
+                st.InstallmentPlanTransformer(id="ip2", attributes={"name": "QUARTER"}),
+                st.InstallmentPlanTransformer(id="ip3", attributes={"name": "SEMI-ANNUAL"}),
+            ],
+        }
+    )
+    return product
+
+
+JSONAPI_RECURSIVE_TRANSFORMER = _build_recursive_transformer()
 
 # JSONAPI message with circular dependencies
 # pc1 -> d1 -> pc1
-# Dev Note: Regarding the `rel_ids` tracking system in the code, this is how it would work for this
-# test case: when trying to unpack "p1"s relationship to "pc1", `_find_include` will be called in
-# order to find that "pc1" include. It will be called with these arugments:
-#     include_type = "product_coverage"
-#     identifier = "pc1"
-#     identifier_type = "id"
-#     parent_identifier = "p1"
-#     rel_ids = {}
-#
-# At the end of the call to `_find_include`, the value of `rel_ids` will be `{'p1': ['pc1']}`
-# because the key is the owning relationship ("p1") and the value is the list of its relationships.
-# Now since "pc1" has it's own relationship to "d1", `_find_include` will be called once more with
-#     include_type = "deductible"
-#     identifier = "d1"
-#     identifier_type = "id"
-#     parent_identifier = "pc1"
-#     rel_ids = {'p1': ['pc1']}
-#
-# Now `_find_include` will do its search and find that "deductble" relationship and will set
-# `rel_ids` to: `{'p1': ['pc1', 'd1']}`. The reason it did this is because it found that the parent
-# here ("pc1") is inside of a list. That means that there is a chain of relationships that needs to
-# be modeled. In order to model that, it appends this newly found include, "d1", to the end of that
-# list.
-#
-# Final (throw-away) value for `rel_ids` in this case is `{'p1': ['pc1', 'd1']}`
 JSONAPI_SIMPLE_RECURSIVE = {
     "data": {
         "type": "product",
@@ -684,30 +687,24 @@ JSONAPI_SIMPLE_RECURSIVE = {
         },
     ],
 }
-JSONAPI_SIMPLE_RECURSIVE_TRANSFORMER = st.ProductTransformer(
-    id="p1",
-    attributes={"is_admitted": True},
-    relationships={
-        "coverages": [
-            st.ProductCoverageTransformer(
-                id="pc1",
-                attributes={"base_premium": "100.00"},
-                relationships={
-                    "deductibles": [
-                        st.DeductibleTransformer(
-                            id="d1",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ]
-                },
-            )
-        ]
-    },
-)
-# fmt: off
-JSONAPI_SIMPLE_RECURSIVE_TRANSFORMER.relationships["coverages"][0].relationships["deductibles"][0].relationships["coverage"] = JSONAPI_SIMPLE_RECURSIVE_TRANSFORMER.relationships["coverages"][0]
-# fmt: on
+
+
+def _build_simple_recursive_transformer():
+    """
+    Build the expected transformer for JSONAPI_SIMPLE_RECURSIVE, where d1 refers back to pc1.
+    """
+    coverage = st.ProductCoverageTransformer(id="pc1", attributes={"base_premium": "100.00"})
+    coverage.relationships["deductibles"] = [
+        st.DeductibleTransformer(
+            id="d1", attributes={"amount": "500.00"}, relationships={"coverage": coverage}
+        )
+    ]
+    return st.ProductTransformer(
+        id="p1", attributes={"is_admitted": True}, relationships={"coverages": [coverage]}
+    )
+
+
+JSONAPI_SIMPLE_RECURSIVE_TRANSFORMER = _build_simple_recursive_transformer()
 
 # JSONAPI message where one included item is used by multiple data items.
 # a1 is related to by both p1 and p2.
@@ -728,24 +725,17 @@ JSONAPI_RECURSIVE_LIST = {
     ],
     "included": [{"type": "agency", "id": "a1", "attributes": {"commission_percent": "20.00"}}],
 }
+_agency = st.AgencyTransformer(id="a1", attributes={"commission_percent": "20.00"})
 JSONAPI_RECURSIVE_LIST_TRANSFORMERS = [
     st.ProductTransformer(
         id="p1",
         attributes={"created_date": "2019-01-09T15:16:24.988798+0000"},
-        relationships={
-            "agency": st.AgencyTransformer(
-                id="a1", attributes={"commission_percent": "20.00"}, relationships={}
-            )
-        },
+        relationships={"agency": _agency},
     ),
     st.ProductTransformer(
         id="p2",
         attributes={"created_date": "2019-01-09T15:15:43.531966+0000"},
-        relationships={
-            "agency": st.AgencyTransformer(
-                id="a1", attributes={"commission_percent": "20.00"}, relationships={}
-            )
-        },
+        relationships={"agency": _agency},
     ),
 ]
 
@@ -807,7 +797,7 @@ JSONAPI_TOP_LIST_WITH_INCLUDES = {
 }
 # JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN is the same as JSONAPI_TOP_LIST_WITH_INCLUDES, but
 # without the links and meta keys.
-JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN = deepcopy(JSONAPI_TOP_LIST_WITH_INCLUDES)
+JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN = copy_json(JSONAPI_TOP_LIST_WITH_INCLUDES)
 del JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN["links"]
 del JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN["meta"]
 del JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN["data"][0]["relationships"]["coverages"]["meta"]
@@ -1091,224 +1081,108 @@ JSONAPI_COMPLEX_RECURSIVE = {
         },
     ],
 }
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER = st.ProductTransformer(
-    id="p1",
-    attributes={"name": "Rentsure"},
-    relationships={
-        "terms": [
-            st.TermTransformer(
-                id="t1",
-                attributes={"term_length_max": 12},
-                relationships={"product": reference_placeholder},
-            ),
-            st.TermTransformer(
-                id="t2",
-                attributes={"term_length_max": 6},
-                relationships={"product": reference_placeholder},
-            ),
-        ],
-        "deductibles": [
-            st.ProductDeductibleTransformer(
-                id="pd1",
-                attributes={"amount": "1000.00"},
-                relationships={"product": reference_placeholder},
-            ),
-            st.ProductDeductibleTransformer(
-                id="pd2",
-                attributes={"amount": "500.00"},
-                relationships={"product": reference_placeholder},
-            ),
-            st.ProductDeductibleTransformer(
-                id="pd3",
-                attributes={"amount": "250.00"},
-                relationships={"product": reference_placeholder},
-            ),
-        ],
-        "coverages": [
-            st.ProductCoverageTransformer(
-                id="pc1",
-                attributes={"label": "Unscheduled Jewelry"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l4",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc2",
-                attributes={"label": "Tenants Plus"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc3",
-                attributes={"label": "Water Backup"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc4",
-                attributes={"label": "Pet Damage"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l6",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc5",
-                attributes={"label": "Coverage F - Medical Payments"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l9",
-                            attributes={"amount": "2000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                        st.LimitTransformer(
-                            id="l1",
-                            attributes={"amount": "1000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                        st.LimitTransformer(
-                            id="l3",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                    ],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc6",
-                attributes={"label": "Coverage E - Liability"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l8",
-                            attributes={"amount": "300000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                        st.LimitTransformer(
-                            id="l2",
-                            attributes={"amount": "100000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                        st.LimitTransformer(
-                            id="l10",
-                            attributes={"amount": "50000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        ),
-                    ],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc7",
-                attributes={"label": "Coverage D - Loss of Use"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l5",
-                            attributes={"amount": "2000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "deductibles": [],
-                    "depends_on": st.ProductCoverageTransformer(
-                        id="pc8",
-                        attributes={"label": "Coverage C - Property"},
-                        relationships={
-                            "product": reference_placeholder,
-                            "limits": [
-                                st.LimitTransformer(
-                                    id="l7",
-                                    attributes={"amount": "10000.00"},
-                                    relationships={"coverage": reference_placeholder},
-                                )
-                            ],
-                            "deductibles": [],
-                            "depends_on": None,
-                        },
-                    ),
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="pc8",
-                attributes={"label": "Coverage C - Property"},
-                relationships={
-                    "product": reference_placeholder,
-                    "limits": [
-                        st.LimitTransformer(
-                            id="l7",
-                            attributes={"amount": "10000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "deductibles": [],
-                    "depends_on": None,
-                },
-            ),
-        ],
-        "states": [],
-        "limits": [],
-        "company": st.CompanyTransformer(id="c1", attributes={}, relationships={}),
-        "agency": st.AgencyTransformer(
-            id="fcd74b40-a110-4f59-b88b-a3fa17146891", attributes={}, relationships={}
-        ),
-        "parent": None,
-        "product_type": st.ProductTypeTransformer(id="pt1", attributes={}, relationships={}),
-        "installment_plans": [
-            st.InstallmentPlanTransformer(id="ip1", attributes={}, relationships={}),
-            st.InstallmentPlanTransformer(id="ip2", attributes={}, relationships={}),
-            st.InstallmentPlanTransformer(id="ip3", attributes={}, relationships={}),
-        ],
-    },
+
+# The product coverages of JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER, as
+# (coverage_id, label, limits, depends_on) where limits are (limit_id, amount) pairs and depends_on
+# is the id of another coverage, if any. Only the expected transformer is built from this table, so
+# that it is checked against the independently written JSONAPI_COMPLEX_RECURSIVE.
+_COMPLEX_RECURSIVE_COVERAGES = (
+    ("pc1", "Unscheduled Jewelry", (("l4", "500.00"),), None),
+    ("pc2", "Tenants Plus", (), None),
+    ("pc3", "Water Backup", (), None),
+    ("pc4", "Pet Damage", (("l6", "500.00"),), None),
+    (
+        "pc5",
+        "Coverage F - Medical Payments",
+        (("l9", "2000.00"), ("l1", "1000.00"), ("l3", "500.00")),
+        None,
+    ),
+    (
+        "pc6",
+        "Coverage E - Liability",
+        (("l8", "300000.00"), ("l2", "100000.00"), ("l10", "50000.00")),
+        None,
+    ),
+    ("pc7", "Coverage D - Loss of Use", (("l5", "2000.00"),), "pc8"),
+    ("pc8", "Coverage C - Property", (("l7", "10000.00"),), None),
 )
-for relationship in ("coverages", "deductibles", "terms"):
-    for item in JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER[relationship]:
-        item.relationships["product"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER
-# fmt: off
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][6]["depends_on"].relationships["product"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][0]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][0]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][3]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][3]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]["limits"][1].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]["limits"][2].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][4]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]["limits"][1].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]["limits"][2].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][5]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][6]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][6]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][6]["depends_on"]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][7]
-JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][7]["limits"][0].relationships["coverage"] = JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER["coverages"][7]
-# fmt: on
+
+
+def _build_complex_recursive_transformer():
+    """
+    Build the expected transformer for JSONAPI_COMPLEX_RECURSIVE. Each transformer is created
+    before the ones that refer back to it, so the circular relationships can be set as they are
+    built.
+    """
+    product = st.ProductTransformer(id="p1", attributes={"name": "Rentsure"})
+
+    def build_coverage(coverage_id, label, limits):
+        coverage = st.ProductCoverageTransformer(id=coverage_id, attributes={"label": label})
+        coverage.relationships.update(
+            {
+                "product": product,
+                "limits": [
+                    st.LimitTransformer(
+                        id=limit_id,
+                        attributes={"amount": amount},
+                        relationships={"coverage": coverage},
+                    )
+                    for limit_id, amount in limits
+                ],
+                "deductibles": [],
+                "depends_on": None,
+            }
+        )
+        return coverage
+
+    coverages_by_id = {
+        coverage_id: build_coverage(coverage_id, label, limits)
+        for coverage_id, label, limits, _depends_on in _COMPLEX_RECURSIVE_COVERAGES
+    }
+    # set once all coverages exist, as a coverage can depend on one listed after it
+    for coverage_id, _label, _limits, depends_on in _COMPLEX_RECURSIVE_COVERAGES:
+        if depends_on is not None:
+            coverages_by_id[coverage_id].relationships["depends_on"] = coverages_by_id[depends_on]
+
+    product.relationships.update(
+        {
+            "terms": [
+                st.TermTransformer(
+                    id="t1", attributes={"term_length_max": 12}, relationships={"product": product}
+                ),
+                st.TermTransformer(
+                    id="t2", attributes={"term_length_max": 6}, relationships={"product": product}
+                ),
+            ],
+            "deductibles": [
+                st.ProductDeductibleTransformer(
+                    id="pd1", attributes={"amount": "1000.00"}, relationships={"product": product}
+                ),
+                st.ProductDeductibleTransformer(
+                    id="pd2", attributes={"amount": "500.00"}, relationships={"product": product}
+                ),
+                st.ProductDeductibleTransformer(
+                    id="pd3", attributes={"amount": "250.00"}, relationships={"product": product}
+                ),
+            ],
+            "coverages": list(coverages_by_id.values()),
+            "states": [],
+            "limits": [],
+            "company": st.CompanyTransformer(id="c1"),
+            "agency": st.AgencyTransformer(id="fcd74b40-a110-4f59-b88b-a3fa17146891"),
+            "parent": None,
+            "product_type": st.ProductTypeTransformer(id="pt1"),
+            "installment_plans": [
+                st.InstallmentPlanTransformer(id="ip1"),
+                st.InstallmentPlanTransformer(id="ip2"),
+                st.InstallmentPlanTransformer(id="ip3"),
+            ],
+        }
+    )
+    return product
+
+
+JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER = _build_complex_recursive_transformer()
 
 # TO JSONAPI TESTS
 TO_JSONAPI_COMPLEX_TRANSFORMER = st.ProductTransformer(
@@ -1571,91 +1445,93 @@ JSONAPI_RECURSIVE_WITH_IDS_AS_INTEGERS = {
         },
     ],
 }
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS = st.ProductTransformer(
-    id="1",
-    attributes={"is_admitted": True},
-    relationships={
-        "terms": [
-            st.TermTransformer(
-                id="2",
-                attributes={"term_length_unit": "months"},
-                relationships={"product": reference_placeholder},
-            )
-        ],
-        "states": [],
-        "coverages": [
-            st.ProductCoverageTransformer(
-                id="3",
-                attributes={"base_premium": "100.00"},
-                relationships={
-                    "limits": [
-                        st.LimitTransformer(
-                            id="12",
-                            attributes={"amount": "2000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "product": reference_placeholder,
-                    "deductibles": [
-                        st.DeductibleTransformer(
-                            id="10",
-                            attributes={"amount": "500.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "depends_on": None,
-                },
-            ),
-            st.ProductCoverageTransformer(
-                id="4",
-                attributes={"base_premium": "200.00"},
-                relationships={
-                    "limits": [
-                        st.LimitTransformer(
-                            id="13",
-                            attributes={"amount": "5000.00"},
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "product": reference_placeholder,
-                    "deductibles": [
-                        st.DeductibleTransformer(
-                            id="11",
-                            attributes={
-                                "created_date": "2018-05-31T01:07:04.123219",
-                                "modified_date": "2018-05-31T01:07:04.123233",
-                                "amount": "100.00",
-                            },
-                            relationships={"coverage": reference_placeholder},
-                        )
-                    ],
-                    "depends_on": None,
-                },
-            ),
-        ],
-        "deductibles": [
-            st.ProductDeductibleTransformer(
-                id="5",
-                attributes={"amount": "500.00"},
-                relationships={"product": reference_placeholder},
-            )
-        ],
-        "company": st.CompanyTransformer(id="5"),
-        "product_type": st.ProductTypeTransformer(id="6"),
-        "installment_plans": [
-            st.InstallmentPlanTransformer(id="7", attributes={"name": "MONTH"}),
-            st.InstallmentPlanTransformer(id="8", attributes={"name": "QUARTER"}),
-            st.InstallmentPlanTransformer(id="9", attributes={"name": "SEMI-ANNUAL"}),
-        ],
-    },
+
+
+def _build_recursive_transformer_with_ids_as_integers():
+    """
+    Build the expected transformer for JSONAPI_RECURSIVE_WITH_IDS_AS_INTEGERS, the same way as
+    `_build_recursive_transformer`.
+    """
+    product = st.ProductTransformer(id="1", attributes={"is_admitted": True})
+
+    coverage_3 = st.ProductCoverageTransformer(id="3", attributes={"base_premium": "100.00"})
+    coverage_3.relationships.update(
+        {
+            "limits": [
+                st.LimitTransformer(
+                    id="12",
+                    attributes={"amount": "2000.00"},
+                    relationships={"coverage": coverage_3},
+                )
+            ],
+            "product": product,
+            "deductibles": [
+                st.DeductibleTransformer(
+                    id="10",
+                    attributes={"amount": "500.00"},
+                    relationships={"coverage": coverage_3},
+                )
+            ],
+            "depends_on": None,
+        }
+    )
+
+    coverage_4 = st.ProductCoverageTransformer(id="4", attributes={"base_premium": "200.00"})
+    coverage_4.relationships.update(
+        {
+            "limits": [
+                st.LimitTransformer(
+                    id="13",
+                    attributes={"amount": "5000.00"},
+                    relationships={"coverage": coverage_4},
+                )
+            ],
+            "product": product,
+            "deductibles": [
+                st.DeductibleTransformer(
+                    id="11",
+                    attributes={
+                        "created_date": "2018-05-31T01:07:04.123219",
+                        "modified_date": "2018-05-31T01:07:04.123233",
+                        "amount": "100.00",
+                    },
+                    relationships={"coverage": coverage_4},
+                )
+            ],
+            "depends_on": None,
+        }
+    )
+
+    product.relationships.update(
+        {
+            "terms": [
+                st.TermTransformer(
+                    id="2",
+                    attributes={"term_length_unit": "months"},
+                    relationships={"product": product},
+                )
+            ],
+            "states": [],
+            "coverages": [coverage_3, coverage_4],
+            "deductibles": [
+                st.ProductDeductibleTransformer(
+                    id="5",
+                    attributes={"amount": "500.00"},
+                    relationships={"product": product},
+                )
+            ],
+            "company": st.CompanyTransformer(id="5"),
+            "product_type": st.ProductTypeTransformer(id="6"),
+            "installment_plans": [
+                st.InstallmentPlanTransformer(id="7", attributes={"name": "MONTH"}),
+                st.InstallmentPlanTransformer(id="8", attributes={"name": "QUARTER"}),
+                st.InstallmentPlanTransformer(id="9", attributes={"name": "SEMI-ANNUAL"}),
+            ],
+        }
+    )
+    return product
+
+
+JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS = (
+    _build_recursive_transformer_with_ids_as_integers()
 )
-# fmt: off
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["terms"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["deductibles"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][0].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][1].relationships["product"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][0]["limits"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][0]
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][0]["deductibles"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][0]
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][1]["limits"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][1]
-JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][1]["deductibles"][0].relationships["coverage"] = JSONAPI_RECURSIVE_TRANSFORMER_WITH_IDS_AS_INTEGERS["coverages"][1]
-# fmt: on
@@ -1,5 +1,6 @@
 import re
-from copy import deepcopy
+from collections import UserDict
+from copy import copy
 
 import pytest
 
@@ -10,48 +11,62 @@ from transformers.impl import factories_impl, transformers_impl
 from transformers.transformers import JSONAPIListTransformer, JSONAPITransformer
 
 
+@pytest.fixture(scope="class")
+def transformer_factory():
+    # Built once for all the tests in this class; tests must not modify it.
+    return JSONAPITransformerFactory(
+        transformer_classes=[
+            st.CustomerTransformer,
+            st.ProductTransformer,
+            st.QuoteTransformer,
+            st.AgentTransformer,
+            st.AgencyTransformer,
+            st.DocumentTransformer,
+            st.TermTransformer,
+            st.ProductCoverageTransformer,
+            st.ProductDeductibleTransformer,
+            st.CompanyTransformer,
+            st.ProductTypeTransformer,
+            st.InstallmentPlanTransformer,
+            st.DeductibleTransformer,
+            st.LimitTransformer,
+            st.PolicyTransformer,
+            st.InsuredRiskTransformer,
+            st.AgentLicenseTransformer,
+            st.AgentAppointmentTransformer,
+            st.BlacklistedEntityTransformer,
+            st.AlternateIdentityTransformer,
+            st.AddressTransformer,
+        ]
+    )
+
+
 class TestJSONAPITransformerFactory:
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.transformer_factory = JSONAPITransformerFactory(
-            transformer_classes=[
-                st.CustomerTransformer,
-                st.ProductTransformer,
-                st.QuoteTransformer,
-                st.AgentTransformer,
-                st.AgencyTransformer,
-                st.DocumentTransformer,
-                st.TermTransformer,
-                st.ProductCoverageTransformer,
-                st.ProductDeductibleTransformer,
-                st.CompanyTransformer,
-                st.ProductTypeTransformer,
-                st.InstallmentPlanTransformer,
-                st.DeductibleTransformer,
-                st.LimitTransformer,
-                st.PolicyTransformer,
-                st.InsuredRiskTransformer,
-                st.AgentLicenseTransformer,
-                st.AgentAppointmentTransformer,
-                st.BlacklistedEntityTransformer,
-                st.AlternateIdentityTransformer,
-                st.AddressTransformer,
-            ]
-        )
+    def setup(self, transformer_factory):
+        self.transformer_factory = transformer_factory
+
+    def test_data_fixture_transformers_only_relate_to_transformers(self):
+        """
+        This is a meta test to ensure that the fixtures are built correctly. If this test fails,
+        a transformer fixture relates to something that is not a transformer, such as a
+        placeholder that was never replaced.
+        """
+        root_transformers = []
+        for value in vars(dt).values():
+            if isinstance(value, JSONAPITransformer):
+                root_transformers.append(value)
+            elif isinstance(value, list):
+                root_transformers.extend(
+                    item for item in value if isinstance(item, JSONAPITransformer)
+                )
+        assert root_transformers
 
-    def test_data_fixture_transformers_replacing_reference_placeholder(self):
-        """
-        This is a meta test to ensure that the fixture is being populated correctly.
-        If this test fails, it would mean that there exists `reference_placeholder` instances
-        on the transformer fixture. This is not allowed and should be replaced within the
-        fixture.
-        """
-        transformers = (item for item in vars(dt) if isinstance(item, JSONAPITransformer))
-        for transformer in transformers:
-            for (
-                related_transformer
-            ) in transformers_impl.iter_transformer_and_relationships_recursively(transformer):
-                assert related_transformer is not dt.reference_placeholder
+        for root_transformer in root_transformers:
+            for transformer in transformers_impl.iter_transformer_and_relationships_recursively(
+                root_transformer
+            ):
+                assert isinstance(transformer, JSONAPITransformer)
 
     def test_get_class_for_type_success(self):
         """
@@ -75,7 +90,7 @@ class TestJSONAPITransformerFactory:
         Verify that if allow_generic is True, then the JSONAPITransformer class is returned for a
         non-existent transformer.
         """
-        factory = self.transformer_factory
+        factory = copy(self.transformer_factory)
         factory.allow_generic = True
         result = factories_impl.get_class_for_type(factory, "non-existent")
         assert result == JSONAPITransformer
@@ -122,6 +137,26 @@ class TestJSONAPITransformerFactory:
         assert expected_transformer == actual_transformer
         assert actual_transformer == expected_transformer
 
+    def test_from_jsonapi_accepts_tuple_relationship_data(self):
+        """
+        To-many relationship data may be a tuple, not only the lists JSON parsers produce.
+        """
+        message = dt.copy_json(dt.JSONAPI_LIST)
+        customer = message["data"]["relationships"]["customer"]
+        customer["data"] = tuple(customer["data"])
+
+        assert self.transformer_factory.from_jsonapi(message) == dt.JSONAPI_LIST_TRANSFORMER
+
+    def test_from_jsonapi_accepts_non_dict_mapping_relationship_data(self):
+        """
+        To-one relationship data may be any mapping, and is not mistaken for a to-many list.
+        """
+        message = dt.copy_json(dt.JSONAPI_LIST)
+        product = message["data"]["relationships"]["product"]
+        product["data"] = UserDict(product["data"])
+
+        assert self.transformer_factory.from_jsonapi(message) == dt.JSONAPI_LIST_TRANSFORMER
+
     def test_recursive_jsonapi_reuses_same_transformer(self):
         """
         The same instance of a transformer should be reused for all transformer relationships
@@ -134,11 +169,19 @@ class TestJSONAPITransformerFactory:
         ]
         assert len(set(transformer_ids)) == len(transformer_ids)
 
+    def test_from_jsonapi_does_not_modify_input(self):
+        """
+        The JSONAPI input must be left untouched, even though it is no longer copied up front.
+        """
+        message = dt.copy_json(dt.JSONAPI_COMPLEX_RECURSIVE)
+        self.transformer_factory.from_jsonapi(message)
+        assert message == dt.JSONAPI_COMPLEX_RECURSIVE
+
     def test_from_jsonapi_raises_relationship_missing_id_or_lid(self):
         """
         JSONAPI relationships missing id or lid should throw an error.
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         message.pop("included")
         message["data"]["relationships"]["customer"]["data"].pop("lid")
 
@@ -151,7 +194,7 @@ class TestJSONAPITransformerFactory:
         """
         Verify that relationships containing these keys will raise an error.
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         customer = message["data"]["relationships"]["customer"]["data"]
         customer[key] = {"something": "not_allowed"}
 
@@ -165,7 +208,7 @@ class TestJSONAPITransformerFactory:
         that are not matched up with any relationship, since all includes must be matched to
         something.
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         message["included"].append({"type": "customer", "lid": "LID-C2", "attributes": {"a": "b"}})
         message["included"].append({"type": "agent", "lid": "LID-A1", "attributes": {"a": "b"}})
 
@@ -181,7 +224,7 @@ class TestJSONAPITransformerFactory:
         All local id entries in a relationship must be matched up to some entry from the included
         list.
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         del message["included"]
 
         msg = "Missing matching include for relationship in data.relationships: LID-C"
@@ -193,18 +236,31 @@ class TestJSONAPITransformerFactory:
         Verify that from_jsonapi() will raise an error when a top level resource contains duplicate
         resource id/lids
         """
-        message = deepcopy(dt.JSONAPI_SAME_ID_VALUE_IN_TOP_LEVEL_RESOURCE)
+        message = dt.copy_json(dt.JSONAPI_SAME_ID_VALUE_IN_TOP_LEVEL_RESOURCE)
 
         msg = "Resource quote has duplicate id: id1"
         with pytest.raises(ContentValidationError, match=msg):
             self.transformer_factory.from_jsonapi(message)
 
+    def test_from_jsonapi_raises_duplicate_resource_key_for_ids_equal_as_strings(self):
+        """
+        Ids are compared as strings, as they are in resource keys, so `1` and `"1"` of the same
+        type are duplicates (they would otherwise be silently merged into one transformer).
+        """
+        message = dt.copy_json(dt.JSONAPI_SAME_ID_VALUE_IN_TOP_LEVEL_RESOURCE)
+        message["data"][0]["id"] = 1
+        message["data"][1]["id"] = "1"
+
+        msg = "Resource quote has duplicate id: 1"
+        with pytest.raises(ContentValidationError, match=msg):
+            self.transformer_factory.from_jsonapi(message)
+
     def test_from_jsonapi_raises_duplicate_resource_key_in_includes_errors(self):
         """
         Verify that from_jsonapi() will raise an error when a top level resource contains duplicate
         resource id/lids
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         message["included"].append({"type": "customer", "lid": "LID-C", "attributes": {"a": "b"}})
 
         msg = "Resource customer has duplicate lid: LID-C."
@@ -216,7 +272,7 @@ class TestJSONAPITransformerFactory:
         Verify that from_jsonapi() will raise an error when a top level resource contains duplicate
         resource id/lids
         """
-        message = deepcopy(dt.BASIC_JSONAPI)
+        message = dt.copy_json(dt.BASIC_JSONAPI)
         message["included"].extend(
             [
                 {"type": "customer", "id": "LID-C", "attributes": {"a": "b"}},
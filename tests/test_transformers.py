@@ -1,6 +1,10 @@
+import pickle
 import re
-from contextlib import contextmanager
+import sys
+from contextlib import nullcontext
+from copy import copy, deepcopy
 from decimal import Decimal
+from typing import NamedTuple
 from unittest.mock import call, patch
 
 import pytest
@@ -11,7 +15,6 @@ from transformers.impl.transformers_impl import apply_defaults_non_recursively
 from transformers.transformers import JSONAPIListTransformer, JSONAPITransformer
 
 
-@contextmanager
 def should_raise(expected_exception, **kwargs):
     """
     Context manager to allow for conditional expectation of exceptions.
@@ -29,14 +32,31 @@ def should_raise(expected_exception, **kwargs):
         expected_exception: Exception subclass to look for, or None to not expect one.
         **kwargs: passed through to pytest.raises
 
-    Yields:
-        Pytest ExceptionInfo instance or None.
+    Returns:
+        Context manager entering as a pytest ExceptionInfo instance or None.
     """
     if expected_exception is None:
-        yield None
-    else:
-        with pytest.raises(expected_exception, **kwargs) as exception_info:
-            yield exception_info
+        return nullcontext()
+    return pytest.raises(expected_exception, **kwargs)
+
+
+# Transformer classes shared by the parametrized tests below, instead of being redeclared for every
+# parameter. Tests that customize a class's methods still declare their own.
+class MyTransformer(JSONAPITransformer):
+    type_name = "hello"
+
+
+class DeepCopyingTransformer(JSONAPITransformer):
+    type_name = "hello"
+    deep_copy_attributes = True
+
+
+class Coverage(JSONAPITransformer):
+    type_name = "coverage"
+
+
+class InsuredRisk(JSONAPITransformer):
+    type_name = "insured_risk"
 
 
 class TestJSONAPITransformer:
@@ -58,10 +78,53 @@ class TestJSONAPITransformer:
     )
     def test_all_to_jsonapi_data(self, transformer, expected_jsonapi_blob):
         actual = transformer.to_jsonapi()
-        # To verify `==` is symmetric test equality in both directions
-        assert expected_jsonapi_blob == actual
+        # Both sides are plain dicts, so one comparison suffices. (The symmetry of transformer
+        # equality is tested by the `from_jsonapi` tests.)
         assert actual == expected_jsonapi_blob
 
+    @pytest.mark.parametrize(
+        ("transformer_class", "expected_names"),
+        ((MyTransformer, ["foo", "bar"]), (DeepCopyingTransformer, ["foo"])),
+    )
+    def test_to_jsonapi_copies_attributes(self, transformer_class, expected_names):
+        """
+        The attributes dictionary is always copied by `to_jsonapi`, but nested values are only
+        copied when `deep_copy_attributes` is set.
+        """
+        transformer = transformer_class(attributes={"names": ["foo"]})
+
+        attributes = transformer.to_jsonapi()["data"]["attributes"]
+        attributes["names"].append("bar")
+        attributes["other"] = "baz"
+
+        assert "other" not in transformer.attributes
+        assert transformer.attributes["names"] == expected_names
+
+    def test_to_jsonapi_shares_relationship_identifiers_per_transformer(self):
+        """
+        All relationship identifiers for the same related transformer are the same dictionary, so
+        callers must copy one before mutating it. Equal but distinct transformers get their own.
+        """
+        agency = st.AgencyTransformer(id="a1")
+        transformer = st.QuoteTransformer(
+            id="q1",
+            relationships={
+                "agency": agency,
+                "product": st.ProductTransformer(id="p1", relationships={"agency": agency}),
+                "other_agency": st.AgencyTransformer(id="a1"),
+            },
+        )
+
+        jsonapi = transformer.to_jsonapi()
+        relationships = jsonapi["data"]["relationships"]
+        (product,) = jsonapi["included"]
+
+        identifier = relationships["agency"]["data"]
+        assert identifier == {"type": "agency", "id": "a1"}
+        assert product["relationships"]["agency"]["data"] is identifier
+        assert relationships["other_agency"]["data"] == identifier
+        assert relationships["other_agency"]["data"] is not identifier
+
     @pytest.mark.parametrize(
         ("type_name", "expected_error"), (("customer", None), ("foo", ValueError), (None, None))
     )
@@ -195,9 +258,6 @@ class TestJSONAPITransformer:
 
     @pytest.mark.parametrize("value", (None, "string", "", 1, 3.14, Decimal("100")))
     def test_eq_when_relationships_contains_non_jsonapi_transformer(self, value):
-        class MyTransformer(JSONAPITransformer):
-            type_name = "hello"
-
         foo = MyTransformer(relationships={"hello": MyTransformer()})
         bar = MyTransformer(relationships={"hello": value})
         # To verify `!=` is symmetric test equality in both directions
@@ -206,15 +266,6 @@ class TestJSONAPITransformer:
 
     @pytest.mark.parametrize("value", (None, "string", "", 1, 3.14, Decimal("100")))
     def test_eq_when_relationships_contains_list_with_non_matching_relationship(self, value):
-        class MyTransformer(JSONAPITransformer):
-            type_name = "hello"
-
-        class Coverage(JSONAPITransformer):
-            type_name = "coverage"
-
-        class InsuredRisk(JSONAPITransformer):
-            type_name = "insured_risk"
-
         foo = MyTransformer(
             relationships={"coverages": [Coverage(relationships={"insured_risk": InsuredRisk()})]}
         )
@@ -227,15 +278,96 @@ class TestJSONAPITransformer:
 
     @pytest.mark.parametrize("value", (None, "string", "", 1, 3.14, Decimal("100")))
     def test_eq_when_relationships_contains_list_compared_with_non_list(self, value):
-        class MyTransformer(JSONAPITransformer):
-            type_name = "hello"
-
         foo = MyTransformer(relationships={"coverages": []})
         bar = MyTransformer(relationships={"coverages": value})
         # To verify `!=` is symmetric test equality in both directions
         assert foo != bar
         assert bar != foo
 
+    def test_eq_when_shared_related_object_is_compared_with_equal_copies(self):
+        """
+        A graph where one related object is reached through two relationships equals a graph that
+        holds a separate, equal copy of it in each, including when the copies refer back to
+        themselves.
+        """
+
+        def build_coverage():
+            coverage = Coverage(id="c2", attributes={"label": "Property"})
+            coverage.relationships["insured_risk"] = InsuredRisk(
+                id="ir1", relationships={"coverage": coverage}
+            )
+            return coverage
+
+        shared = build_coverage()
+        foo = MyTransformer(
+            relationships={
+                "coverages": [Coverage(id="c1", relationships={"depends_on": shared}), shared]
+            }
+        )
+        bar = MyTransformer(
+            relationships={
+                "coverages": [
+                    Coverage(id="c1", relationships={"depends_on": build_coverage()}),
+                    build_coverage(),
+                ]
+            }
+        )
+        dependency = bar.relationships["coverages"][0].relationships["depends_on"]
+        assert dependency is not bar.relationships["coverages"][1]
+
+        # To verify `==` is symmetric test equality in both directions
+        assert foo == bar
+        assert bar == foo
+
+        # and a difference in one of the copies is still found
+        dependency.attributes["label"] = "Other"
+        assert foo != bar
+        assert bar != foo
+
+    def test_list_and_tuple_subclasses_are_to_many_relationships(self):
+        """
+        Subclasses of list and tuple (e.g. named tuples) are to-many relationships, like lists and
+        tuples themselves, when serializing, applying defaults and comparing.
+        """
+
+        class CoverageList(list):
+            pass
+
+        class CoveragePair(NamedTuple):
+            first: JSONAPITransformer
+            second: JSONAPITransformer
+
+        def build_transformer():
+            return MyTransformer(
+                id="1",
+                relationships={
+                    "coverages": CoverageList([Coverage(id="c1"), Coverage(id="c2")]),
+                    "pair": CoveragePair(Coverage(id="c3"), Coverage(id="c4")),
+                },
+            )
+
+        transformer = build_transformer()
+        transformer.apply_defaults()
+        assert transformer == build_transformer()
+
+        relationships = transformer.to_jsonapi()["data"]["relationships"]
+        assert relationships == {
+            "coverages": {
+                "data": [{"type": "coverage", "id": "c1"}, {"type": "coverage", "id": "c2"}]
+            },
+            "pair": {"data": [{"type": "coverage", "id": "c3"}, {"type": "coverage", "id": "c4"}]},
+        }
+
+    def test_eq_compares_relationships_after_empty_relationship(self):
+        """
+        An empty (``None``) relationship must not end the comparison of the other relationships.
+        """
+        foo = MyTransformer(relationships={"empty": None, "other": MyTransformer(id="1")})
+        bar = MyTransformer(relationships={"empty": None, "other": MyTransformer(id="2")})
+        # To verify `!=` is symmetric test equality in both directions
+        assert foo != bar
+        assert bar != foo
+
 
 class TestJSONAPIListTransformer:
     @pytest.mark.parametrize(
@@ -253,10 +385,28 @@ class TestJSONAPIListTransformer:
     )
     def test_all_list_to_jsonapi_data(self, transformer_list, expected_jsonapi_blob):
         actual = JSONAPIListTransformer(transformer_list).to_jsonapi()
-        # To verify `==` is symmetric test equality in both directions
-        assert expected_jsonapi_blob == actual
+        # Both sides are plain dicts, so one comparison suffices. (The symmetry of transformer
+        # equality is tested by the `from_jsonapi` tests.)
         assert actual == expected_jsonapi_blob
 
+    def test_to_jsonapi_shares_relationship_identifiers_across_transformers(self):
+        """The identifiers for a related transformer are shared by all the listed transformers."""
+        agency = st.AgencyTransformer(id="a1")
+        transformers = [
+            st.QuoteTransformer(id=quote_id, relationships={"agency": agency})
+            for quote_id in ("q1", "q2")
+        ]
+
+        first, second = JSONAPIListTransformer(transformers).to_jsonapi()["data"]
+        identifier = first["relationships"]["agency"]["data"]
+        assert second["relationships"]["agency"]["data"] is identifier
+
+    def test_to_jsonapi_supports_one_shot_iterables(self):
+        """The transformers may be given as a generator, which can only be consumed once."""
+        transformers = (t for t in dt.JSONAPI_TOP_LIST_WITH_INCLUDES_TRANSFORMERS)
+        actual = JSONAPIListTransformer(transformers).to_jsonapi()
+        assert actual == dt.JSONAPI_TOP_LIST_WITH_INCLUDES_CLEAN
+
     @pytest.mark.parametrize(
         ("input_value", "exp_error"),
         (
@@ -269,6 +419,26 @@ class TestJSONAPIListTransformer:
         with should_raise(TypeError, match=exp_error):
             JSONAPIListTransformer(input_value).to_jsonapi()
 
+    def test_to_jsonapi_includes_equal_related_objects_once(self):
+        """Distinct related objects with the same type and id are only included once."""
+        transformers = [
+            st.ProductTransformer(
+                id=product_id,
+                relationships={
+                    "agency": st.AgencyTransformer(
+                        id="a1", attributes={"commission_percent": "20.00"}
+                    )
+                },
+            )
+            for product_id in ("p1", "p2")
+        ]
+
+        actual = JSONAPIListTransformer(transformers).to_jsonapi()
+
+        assert actual["included"] == [
+            {"type": "agency", "id": "a1", "attributes": {"commission_percent": "20.00"}}
+        ]
+
 
 @pytest.mark.parametrize(
     ("value", "expected"),
@@ -323,8 +493,9 @@ def test_jsonapi_spec_requires_id_is_string_in_relationships(value, expected):
             "related_item": JSONAPITransformer(type_name="my_related", id=value, lid="my_lid")
         },
     )
-    related_data = transformer.to_jsonapi()["data"]["relationships"]["related_item"]["data"]
-    included = transformer.to_jsonapi()["included"][0]
+    jsonapi = transformer.to_jsonapi()
+    related_data = jsonapi["data"]["relationships"]["related_item"]["data"]
+    included = jsonapi["included"][0]
     if expected is None:
         assert "id" not in related_data
         assert "id" not in included
@@ -352,8 +523,9 @@ def test_jsonapi_spec_requires_lid_is_string_in_relationships(value, expected):
             )
         },
     )
-    related_data = transformer.to_jsonapi()["data"]["relationships"]["related_item"]["data"]
-    included = transformer.to_jsonapi()["included"][0]
+    jsonapi = transformer.to_jsonapi()
+    related_data = jsonapi["data"]["relationships"]["related_item"]["data"]
+    included = jsonapi["included"][0]
     if expected is None:
         assert "lid" not in related_data
         assert "lid" not in included
@@ -400,6 +572,34 @@ def test_jsonapi_spec_requires_attribute_and_relationship_keys_must_be_unique():
         transformer.to_jsonapi()
 
 
+def test_contains_checks_attributes_and_relationships():
+    transformer = JSONAPITransformer(
+        type_name="quote",
+        attributes={"hello": "world", "both": "attribute"},
+        relationships={
+            "related": JSONAPITransformer(type_name="my_related", id="my_id"),
+            "both": JSONAPITransformer(type_name="my_both_related", id="my_both_id"),
+        },
+    )
+
+    assert "hello" in transformer
+    assert "related" in transformer
+    assert "both" in transformer
+    assert "nothing" not in transformer
+
+
+def test_type_names_are_interned():
+    # built at runtime, so the compiler doesn't intern them
+    generic_type_name = "-".join(["generic", "type"])
+    subclass_type_name = "-".join(["subclass", "type"])
+
+    class SubclassTransformer(JSONAPITransformer):
+        type_name = subclass_type_name
+
+    assert JSONAPITransformer(type_name=generic_type_name).type_name is sys.intern("generic-type")
+    assert SubclassTransformer.type_name is sys.intern("subclass-type")
+
+
 def test_jsonapi_spec_requires_type_name_to_be_string():
     error_msg = "`type_name` must be a string."
 
@@ -411,3 +611,15 @@ def test_jsonapi_spec_requires_type_name_to_be_string():
 
     with should_raise(ContentValidationError, match=re.escape(error_msg)):
         transformer.to_jsonapi()
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_transformers_can_be_pickled(protocol):
+    transformer = dt.JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER
+    assert pickle.loads(pickle.dumps(transformer, protocol)) == transformer
+
+
+def test_transformers_can_be_copied():
+    transformer = dt.JSONAPI_COMPLEX_RECURSIVE_TRANSFORMER
+    assert vars(copy(transformer)) == vars(transformer)
+    assert deepcopy(transformer) == transformer